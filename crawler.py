@@ -7,19 +7,10 @@ from bs4 import BeautifulSoup
 import logging
 from urllib.parse import urldefrag, urljoin
 import concurrent.futures
-from util import format_time
+from util import format_time, print_header
 from time import time_ns
 
 
-def print_header(text: str):
-    """
-    Prints the text with `-` characters left and right to create a header
-    """
-    text = "\n" + "-" * int(40 - len(text) / 2) + text
-    text += "-" * int(80 - len(text))
-    print(text)
-
-
 def download(url: str) -> Tuple[str, BeautifulSoup]:
     """
     Download a url and return the final url (after redirects) and the
@@ -161,14 +152,15 @@ def main():
                     # The url redirected to new_url a page we already explored
                     continue
 
-                # Add the current page to the index
+                # Add the current page (and the link graph) to the index
                 website = extract_metadata(new_url, body)
                 words = extract_text(body)
-                index.add_website(website, words)
+                links = extract_links(new_url, body)
+                aliases = [url] if url != new_url else []
+                index.add_website(website, words, links, aliases)
 
                 # Update crawlers internal data to add new discoverd links but
                 # make sure we never download a page twice
-                links = extract_links(new_url, body)
                 links = filter(lambda l: l not in seen, links)
                 queue.extend(links)
                 seen.add(new_url)
@@ -1,5 +1,7 @@
 import logging
-from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+from array import array
+from itertools import chain
 import os
 import json
 import re
@@ -73,6 +75,16 @@ class Index:
                     word    │     │  positions
                             │     │
                         entry   web_id
+
+    Finally, the index also stores the link graph between the websites, which
+    is needed to compute the PageRank (see `pagerank.py`). The graph is saved
+    in the compressed sparse row (CSR) format in two binary files:
+    `links.indptr` (int64) and `links.indices` (int32). The outgoing links of
+    the website with web_id `i` are the web_ids stored in
+    `indices[indptr[i]:indptr[i + 1]]`. Links to pages that were never
+    crawled are dropped.
+    The PageRank of every website is stored in `pagerank.bin` (float32, one
+    value per web_id, normalized so that the average page has a score of 1).
     """
 
     def __init__(
@@ -91,10 +103,28 @@ class Index:
         self.directory: str = directory
         self.websites_file: str = os.path.join(directory, "websites.json")
         self.config_file: str = os.path.join(directory, "config.json")
+        self.links_indptr_file: str = os.path.join(directory, "links.indptr")
+        self.links_indices_file: str = os.path.join(
+            directory, "links.indices"
+        )
+        self.pagerank_file: str = os.path.join(directory, "pagerank.bin")
         self.words: Dict[str, Dict[int, List[int]]] = dict()
         self.unsaved_words: int = 0
         self.word_count: int = 0
         self._num_segments = num_segments
+        self.pagerank: Optional[array] = None
+
+        # While building the index, every url we come across gets a node id,
+        # so that links can be stored as compact integer arrays. Only when
+        # saving are the node ids translated to web_ids.
+        # Links of already saved websites stay on disk and are only merged
+        # when saving, so `_link_starts` is indexed with
+        # `web_id - _num_saved_websites`.
+        self._url_nodes: Dict[str, int] = dict()
+        self._node_web_ids = array("i")  # node id -> web_id (or -1)
+        self._link_starts = array("q")  # offsets in _link_targets
+        self._link_targets = array("i")  # node ids
+        self._num_saved_websites: int = 0
 
         if delete_existing and os.path.exists(self.directory):
             logging.info("Deleting existing index...")
@@ -126,6 +156,9 @@ class Index:
                 self.word_count = config["word_count"]
                 self._num_segments = config["num_segments"]
 
+            self._num_saved_websites = len(self.websites)
+            self._load_pagerank()
+
     ##################ä
     # Text processing #
     ##################ä
@@ -140,6 +173,29 @@ class Index:
         words = list(filter(lambda w: w.strip() != "", words))
         return words
 
+    ###########
+    # Ranking #
+    ###########
+
+    def _load_pagerank(self):
+        """
+        Load the PageRank column computed by `pagerank.py`. If it doesn't
+        exist (or belongs to another crawl) all websites are ranked equally.
+        """
+        if not os.path.exists(self.pagerank_file):
+            return
+
+        pagerank = array("f")
+        if os.path.getsize(self.pagerank_file) != pagerank.itemsize * len(
+            self.websites
+        ):
+            logging.warning("PageRank doesn't match the index, ignoring it")
+            return
+
+        with open(self.pagerank_file, "rb") as file:
+            pagerank.fromfile(file, len(self.websites))
+        self.pagerank = pagerank
+
     ####################
     # Segment handling #
     ####################
@@ -244,12 +300,30 @@ class Index:
     # Index Building #
     ##################
 
-    def add_website(self, website: Website, text: str):
+    def _url_node(self, url: str) -> int:
+        try:
+            return self._url_nodes[url]
+        except KeyError:
+            node = len(self._node_web_ids)
+            self._url_nodes[url] = node
+            self._node_web_ids.append(-1)
+            return node
+
+    def add_website(
+        self,
+        website: Website,
+        text: str,
+        links: Iterable[str] = (),
+        aliases: Iterable[str] = (),
+    ):
         """
         Add a website to the index.
 
-        Runtime: O(n) with n beeing the number of words that are associated
-        with the website.
+        `links` are the urls the website links to and `aliases` are other urls
+        under which the website can be reached (e.g. before a redirect).
+
+        Runtime: O(n + l) with n beeing the number of words that are
+        associated with the website and l the number of links.
 
         Note: this method might write to disk, so some calls might be much
         slower than others. To force a disk-write call `save`.
@@ -262,6 +336,11 @@ class Index:
         self.unsaved_words += len(words)
         self.word_count += len(words)
 
+        for url in chain([website.url], aliases):
+            self._node_web_ids[self._url_node(url)] = web_id
+        self._link_starts.append(len(self._link_targets))
+        self._link_targets.extend(map(self._url_node, links))
+
         for i, word in enumerate(words):
             try:
                 self.words[word][web_id].append(i)
@@ -299,12 +378,98 @@ class Index:
         self.unsaved_words = 0
         self.words = dict()
 
+    def _load_links(self) -> Tuple[array, array]:
+        """
+        Load the saved link graph, so that new links can be appended to it.
+        If it doesn't exist (e.g. the index was created before links were
+        stored) the saved websites get no links.
+        """
+        num_saved = self._num_saved_websites
+        indptr = array("q")
+        indices = array("i")
+
+        if os.path.exists(self.links_indptr_file) and os.path.exists(
+            self.links_indices_file
+        ):
+            with open(self.links_indptr_file, "rb") as file:
+                if os.path.getsize(self.links_indptr_file) == (
+                    indptr.itemsize * (num_saved + 1)
+                ):
+                    indptr.fromfile(file, num_saved + 1)
+
+            with open(self.links_indices_file, "rb") as file:
+                if indptr and os.path.getsize(self.links_indices_file) == (
+                    indices.itemsize * indptr[-1]
+                ):
+                    indices.fromfile(file, indptr[-1])
+                else:
+                    indptr = array("q")
+
+        if not indptr:
+            logging.warning("No valid link graph saved, dropping old links")
+            indptr = array("q", [0]) * (num_saved + 1)
+
+        return indptr, indices
+
+    def _save_links(self) -> int:
+        """
+        Translate the link targets to web_ids and write the link graph in the
+        CSR format. Returns the number of saved links.
+        """
+        num_saved = self._num_saved_websites
+        starts = self._link_starts
+        targets = self._link_targets
+
+        if num_saved == 0:
+            indptr = array("q", [0])
+            indices = array("i")
+        else:
+            indptr, indices = self._load_links()
+
+            # New websites might link to already saved ones, whose urls are
+            # only looked up here so that querying doesn't need the memory.
+            saved_urls = {
+                website.url: web_id
+                for web_id, website in enumerate(self.websites[:num_saved])
+            }
+            for url, node in self._url_nodes.items():
+                if self._node_web_ids[node] == -1:
+                    self._node_web_ids[node] = saved_urls.get(url, -1)
+            del saved_urls
+
+        for web_id in range(num_saved, len(self.websites)):
+            i = web_id - num_saved
+            end = starts[i + 1] if i + 1 < len(starts) else len(targets)
+            row = set(
+                self._node_web_ids[node]
+                for node in targets[starts[i] : end]
+            )
+            row.discard(-1)
+            row.discard(web_id)
+            indices.extend(sorted(row))
+            indptr.append(len(indices))
+
+        with open(self.links_indptr_file, "wb") as file:
+            indptr.tofile(file)
+        with open(self.links_indices_file, "wb") as file:
+            indices.tofile(file)
+
+        # All links are on disk now
+        self._num_saved_websites = len(self.websites)
+        self._link_starts = array("q")
+        self._link_targets = array("i")
+
+        return len(indices)
+
     def save(
         self,
     ):
         # Save all unsaved words
         self._save_words()
 
+        # Save the link graph
+        num_links = self._save_links()
+
         # Save all websites
         with open(self.websites_file, "w") as file:
             json.dump(self.websites, file, default=lambda o: o.__dict__)
@@ -316,6 +481,7 @@ class Index:
         ) / len(self.websites)
         obj["word_count"] = self.word_count
         obj["num_segments"] = self._num_segments
+        obj["num_links"] = num_links
         with open(self.config_file, "w") as file:
             json.dump(obj, file)
 
@@ -331,8 +497,8 @@ class Index:
     ) -> List[int]:
         """
         This is an implemetation of the Okapi BM25 algorithm. It only checks
-        how good a document and a query matches, but asumes all documents have
-        the same quality (which of course isn't the case on the web).
+        how good a document and a query matches, so if a PageRank was computed
+        it is added to the score to account for the quality of the documents.
 
         Wikipedia: https://en.wikipedia.org/wiki/Okapi_BM25
         """
@@ -344,6 +510,7 @@ class Index:
 
         k1 = 1.2  # Tuning variable
         b = 0.75  # Tuning variable
+        w = 1.0  # Weight of the PageRank
         for id in ids:
             score = 0  # Score of the current document (id)
 
@@ -362,6 +529,9 @@ class Index:
                     (f * (k1 + 1)) / (f + k1 * (1 - b + b * (D_abs / avgdl)))
                 )
 
+            if self.pagerank is not None:
+                score += w * math.log1p(self.pagerank[id])
+
             ranked.append((id, score))
 
         # Sort by the score
@@ -0,0 +1,161 @@
+import argparse
+import logging
+import os
+from time import time_ns
+
+import numpy as np
+import scipy.sparse
+
+from util import format_time, print_header
+
+
+def load_links(
+    indptr_file: str, indices_file: str
+) -> scipy.sparse.csc_matrix:
+    """
+    Load the link graph saved by the index and return the transposed
+    adjacency matrix, with every column normalized by the number of outgoing
+    links of the website.
+
+    The CSR arrays of the graph are exactly the CSC arrays of the transposed
+    graph, so the matrix can be built without copying or sorting any edges.
+    """
+    indptr = np.fromfile(indptr_file, np.int64)
+    indices = np.fromfile(indices_file, np.int32)
+    n = len(indptr) - 1
+
+    # Scipy uses one dtype for both arrays, so keep the indptr as small as
+    # the indices to avoid an upcast copy of all edges.
+    if len(indices) < np.iinfo(np.int32).max:
+        indptr = indptr.astype(np.int32)
+
+    out_degree = np.diff(indptr)
+    weights = np.zeros(n, dtype=np.float32)
+    np.divide(1, out_degree, out=weights, where=out_degree > 0)
+    data = np.repeat(weights, out_degree)
+
+    return scipy.sparse.csc_matrix((data, indices, indptr), shape=(n, n))
+
+
+def pagerank(
+    links: scipy.sparse.csc_matrix,
+    damping: float,
+    tolerance: float,
+    max_iterations: int,
+) -> np.ndarray:
+    """
+    Compute the PageRank with the power iteration. The returned ranks sum up
+    to 1.
+
+    Memory: O(n + e) with n beeing the number of websites and e the number of
+    links, all temporary vectors are only of length n.
+
+    Wikipedia: https://en.wikipedia.org/wiki/PageRank
+    """
+    n = links.shape[0]
+    dangling = np.asarray(links.sum(axis=0)).ravel() == 0
+    rank = np.full(n, 1 / n, dtype=np.float32)
+
+    for i in range(max_iterations):
+        # Websites without any links distribute their rank evenly among all
+        # websites, just like the random jumps do.
+        jump = (damping * rank[dangling].sum() + 1 - damping) / n
+
+        new_rank = links @ rank
+        new_rank *= damping
+        new_rank += jump
+
+        delta = np.abs(new_rank - rank).sum(dtype=np.float64)
+        rank = new_rank
+        if delta < tolerance:
+            logging.info(f"PageRank converged after {i + 1} iterations")
+            break
+    else:
+        logging.warning(f"PageRank didn't converge in {max_iterations} steps")
+
+    return rank
+
+
+def main():
+    logging.basicConfig(
+        encoding="utf-8",
+        level=logging.INFO,
+        format="%(asctime)s: %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+    # Setup the CLI interface
+    parser = argparse.ArgumentParser(
+        description="Compute the PageRank for Tinydeamon's index"
+    )
+    parser.add_argument(
+        "--input",
+        default="data/",
+        type=str,
+        help="directory name in which the index is stored (default: data/)",
+    )
+    parser.add_argument(
+        "--damping",
+        default=0.85,
+        type=float,
+        help="damping factor (default: 0.85)",
+    )
+    parser.add_argument(
+        "--tolerance",
+        default=1e-6,
+        type=float,
+        help="stop once the ranks change less than this (default: 1e-6)",
+    )
+    parser.add_argument(
+        "--max-iterations",
+        default=100,
+        type=int,
+        help="maximum number of iterations (default: 100)",
+    )
+    args = parser.parse_args()
+
+    index_dir = args.input
+    print_header("Configuration")
+    print(f"- Index directory: {index_dir}")
+    print(f"- Damping factor: {args.damping}")
+
+    start = time_ns()
+    print_header("Computing")
+    indptr_file = os.path.join(index_dir, "links.indptr")
+    indices_file = os.path.join(index_dir, "links.indices")
+    if not os.path.exists(indptr_file) or not os.path.exists(indices_file):
+        logging.error(
+            f"No link graph in {index_dir}, crawl the websites again to "
+            "create one"
+        )
+        return
+
+    logging.info("Loading link graph...")
+    links = load_links(indptr_file, indices_file)
+    if links.shape[0] == 0:
+        logging.warning("The index is empty, nothing to rank")
+        return
+
+    rank = pagerank(links, args.damping, args.tolerance, args.max_iterations)
+
+    # Normalize the ranks so that an average website has a score of 1, this
+    # makes the score independent of the size of the index.
+    rank *= len(rank)
+
+    # Write to a temporary file first so that a crash never leaves a half
+    # written file behind. Note: the server only reads the PageRank on
+    # startup, so it needs to be restarted to use the new one.
+    pagerank_file = os.path.join(index_dir, "pagerank.bin")
+    rank.astype(np.float32).tofile(pagerank_file + ".tmp")
+    os.replace(pagerank_file + ".tmp", pagerank_file)
+
+    duration = time_ns() - start
+    print_header("Statistics")
+    print(f"- Ranked Websites: {links.shape[0]}")
+    print(f"- Links: {links.nnz}")
+    print(f"- Duration: {format_time(duration)}")
+    print(f"- Saved in: {pagerank_file}")
+
+
+if __name__ == "__main__":
+    main()
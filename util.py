@@ -12,3 +12,12 @@ def format_time(ns: int) -> str:
         return f"{ns/(sec*60):.2f}min"
     else:
         return f"{ns/(sec*60*60):.2f}h"
+
+
+def print_header(text: str):
+    """
+    Prints the text with `-` characters left and right to create a header
+    """
+    text = "\n" + "-" * int(40 - len(text) / 2) + text
+    text += "-" * int(80 - len(text))
+    print(text)